@@ -9,7 +9,8 @@ load_dotenv()
 # Helper to try connecting
 def try_connect(url):
     try:
-        engine = create_engine(url)
+        # Fail fast on a dead host instead of waiting out the TCP timeout
+        engine = create_engine(url, connect_args={"connect_timeout": 2})
         with engine.connect() as connection:
             return engine
     except Exception as e:
@@ -33,28 +34,134 @@ if not engine:
     print("Could not connect to database with any candidate URL.")
     exit(1)
 
-def run_migration():
-    with engine.connect() as connection:
-        # Transaction is automatic with execute for DDL in some configurations,
-        # but to be safe and explicit we can just run raw SQL.
-        # Check if column exists or just try adding it (Postgres will error if exists, catch it)
-        
-        try:
-            print("Adding is_public to piano_sequences...")
-            connection.execute(text("ALTER TABLE piano_sequences ADD COLUMN IF NOT EXISTS is_public BOOLEAN DEFAULT FALSE;"))
-            print("Success.")
-        except Exception as e:
-            print(f"Error updating piano_sequences: {e}")
-
-        try:
-            print("Adding is_public to motor_configs...")
-            connection.execute(text("ALTER TABLE motor_configs ADD COLUMN IF NOT EXISTS is_public BOOLEAN DEFAULT FALSE;"))
-            print("Success.")
-        except Exception as e:
-            print(f"Error updating motor_configs: {e}")
-            
-        # Commit if needed, though DDL often auto-commits or requires it
-        connection.commit()
+def run_step(engine, label, sql):
+    """Run one migration step in its own transaction, so a failure doesn't abort the rest."""
+    try:
+        print(f"{label}...")
+        with engine.begin() as connection:
+            connection.execute(text(sql))
+        print("Success.")
+    except Exception as e:
+        print(f"Error ({label}): {e}")
+
+def add_unique_index(engine, table, key, index_name):
+    """Create a unique index on (user_id, key), unless existing rows would violate it.
+
+    Duplicates are listed rather than deleted: which copy to keep is the owner's
+    call, so resolve them by hand (after taking a backup) and re-run this script.
+    """
+    label = f"Adding unique (user_id, {key}) to {table}"
+    try:
+        print(f"{label}...")
+        with engine.begin() as connection:
+            duplicates = connection.execute(text(
+                f"SELECT user_id, {key}, count(*), array_agg(id ORDER BY id) FROM {table}"
+                f" GROUP BY user_id, {key} HAVING count(*) > 1"
+            )).all()
+            if duplicates:
+                print(f"Skipped: {len(duplicates)} (user_id, {key}) pairs in {table} have duplicates:")
+                for user_id, value, count, ids in duplicates:
+                    print(f"  user_id={user_id} {key}={value!r}: {count} rows, ids {ids}")
+                print(f"Saving to {table} fails until these are resolved and this script is re-run.")
+                return
+            connection.execute(text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table} (user_id, {key});"
+            ))
+        print("Success.")
+    except Exception as e:
+        print(f"Error ({label}): {e}")
+
+def run_migration(engine):
+    # Create any missing tables first (no-op for tables that already exist)
+    import models
+    print("Creating missing tables...")
+    models.Base.metadata.create_all(bind=engine)
+
+    # IF NOT EXISTS makes every step safe to re-run
+    run_step(
+        engine,
+        "Adding is_public to piano_sequences and motor_configs",
+        "ALTER TABLE piano_sequences ADD COLUMN IF NOT EXISTS is_public BOOLEAN DEFAULT FALSE;"
+        " ALTER TABLE motor_configs ADD COLUMN IF NOT EXISTS is_public BOOLEAN DEFAULT FALSE;",
+    )
+    run_step(
+        engine,
+        "Adding weight_data to saved_models",
+        "ALTER TABLE saved_models ADD COLUMN IF NOT EXISTS weight_data BYTEA;",
+    )
+    run_step(
+        engine,
+        "Adding updated_at to saved_models",
+        "ALTER TABLE saved_models ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;",
+    )
+    # lz4 TOAST compression (Postgres 14+) decompresses several times faster than
+    # the default pglz. It applies to rows written from now on; servers built
+    # without lz4 just log an error here and keep pglz.
+    run_step(
+        engine,
+        "Using lz4 compression for saved_models blobs",
+        "ALTER TABLE saved_models ALTER COLUMN model_data SET COMPRESSION lz4,"
+        " ALTER COLUMN dataset SET COMPRESSION lz4;",
+    )
+    run_step(
+        engine,
+        "Adding saved_models indexes",
+        "CREATE INDEX IF NOT EXISTS ix_saved_models_public_created_id ON saved_models (created_at DESC, id DESC) WHERE is_public;"
+        " DROP INDEX IF EXISTS ix_saved_models_public_created;"
+        " CREATE INDEX IF NOT EXISTS ix_saved_models_user_created ON saved_models (user_id, created_at DESC);",
+    )
+
+    # Saving a model or a gesture/piano config upserts on (user_id, name/title).
+    # Earlier code could store duplicates, which block these indexes.
+    add_unique_index(engine, "saved_models", "name", "uq_saved_models_user_name")
+    add_unique_index(engine, "motor_configs", "name", "uq_motor_configs_user_name")
+    add_unique_index(engine, "piano_sequences", "title", "uq_piano_sequences_user_title")
+
+    run_step(
+        engine,
+        "Adding gesture/piano community indexes",
+        "CREATE INDEX IF NOT EXISTS ix_motor_configs_public_created_id ON motor_configs (created_at DESC, id DESC) WHERE is_public;"
+        " CREATE INDEX IF NOT EXISTS ix_piano_sequences_public_created_id ON piano_sequences (created_at DESC, id DESC) WHERE is_public;",
+    )
+
+    # The unique (user_id, name/title) indexes already serve the is_active flip
+    run_step(
+        engine,
+        "Dropping gesture/piano active indexes",
+        "DROP INDEX IF EXISTS ix_motor_configs_user_active;"
+        " DROP INDEX IF EXISTS ix_piano_sequences_user_active;",
+    )
+
+    run_step(
+        engine,
+        "Adding training_sessions index",
+        "CREATE INDEX IF NOT EXISTS ix_training_sessions_user_created ON training_sessions (user_id, created_at DESC);",
+    )
+    # Same as saved_models: samples are large, write-once feature arrays
+    run_step(
+        engine,
+        "Using lz4 compression for training_sessions samples",
+        "ALTER TABLE training_sessions ALTER COLUMN samples SET COMPRESSION lz4;",
+    )
+
+    # Password reset tokens are stateless JWTs now
+    run_step(
+        engine,
+        "Dropping password_reset_tokens",
+        "DROP TABLE IF EXISTS password_reset_tokens;",
+    )
+
+    # Trigram indexes let the community searches' ILIKE '%term%' use an index
+    # scan (a b-tree can't serve a leading wildcard).
+    # Kept last: CREATE EXTENSION needs elevated privileges on some hosts.
+    run_step(
+        engine,
+        "Adding trigram indexes for community search",
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm;"
+        " CREATE INDEX IF NOT EXISTS ix_saved_models_name_trgm ON saved_models USING gin (name gin_trgm_ops);"
+        " CREATE INDEX IF NOT EXISTS ix_motor_configs_name_trgm ON motor_configs USING gin (name gin_trgm_ops);"
+        " CREATE INDEX IF NOT EXISTS ix_piano_sequences_title_trgm ON piano_sequences USING gin (title gin_trgm_ops);",
+    )
 
 if __name__ == "__main__":
-    run_migration()
+    run_migration(engine)
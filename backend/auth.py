@@ -1,24 +1,30 @@
 """
 auth.py — JWT authentication utilities
 
-Provides password hashing (bcrypt), JWT token creation/verification,
+Provides password hashing (argon2, with legacy bcrypt support), JWT token creation/verification,
 and a FastAPI dependency to extract the current user from a Bearer token.
 """
 
 import hashlib
+import hmac
 import os
 import re
+import secrets
 import sys
-from datetime import datetime, timedelta
-from typing import Optional
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional, Tuple
 
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+import jwt
 from passlib.context import CryptContext
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import WEB_CONCURRENCY, get_db
 import models
 
 # ── Config ──────────────────────────────────────────────
@@ -58,52 +64,212 @@ def validate_password(password: str) -> None:
         raise ValueError(f"Password must contain: {', '.join(errors)}")
 
 # ── Password hashing ───────────────────────────────────
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# New hashes use argon2id; bcrypt is kept only to verify legacy hashes, which
+# are flagged by needs_rehash() and upgraded on the user's next login.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,  # KiB
+    argon2__parallelism=1,
+)
 
 def _normalize_password(password: str) -> str:
     """
     Pre-hash password with SHA256 to ensure it fits within bcrypt's 72-byte limit.
-    Returns the hex digest (64 chars).
+    Returns the hex digest (64 chars). Only used for legacy bcrypt hashes.
     """
     return hashlib.sha256(password.encode()).hexdigest()
 
+# argon2 and bcrypt release the GIL while hashing, so threadpool workers already
+# hash in parallel; this only caps how many run at once, so a burst of logins
+# can't pin every CPU (and 64 MiB of argon2 memory per call) at the same time.
+# The default shares the cores among the instance's uvicorn workers.
+KDF_CONCURRENCY = int(os.getenv("KDF_CONCURRENCY", str(max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY))))
+_kdf_slots = threading.BoundedSemaphore(KDF_CONCURRENCY)
+
 def hash_password(password: str) -> str:
-    return pwd_context.hash(_normalize_password(password))
+    with _kdf_slots:
+        return pwd_context.hash(password)
+
+# Recent verify results, so a client re-authenticating with the same credentials
+# doesn't rerun the KDF. Keys are a blake2b MAC under a random per-process pepper
+# and include the stored hash, so nothing reusable is kept and a password change
+# (or rehash) naturally misses.
+VERIFY_CACHE_TTL = 30  # seconds
+_verify_pepper = secrets.token_bytes(32)
+_verify_cache: TTLCache = TTLCache(maxsize=10_000, ttl=VERIFY_CACHE_TTL)
+_verify_lock = threading.Lock()
+
+def verify_password(plain_password: str, hashed_password: Optional[str]) -> bool:
+    if not hashed_password:
+        return False
+    key = hashlib.blake2b(
+        plain_password.encode() + b"\0" + hashed_password.encode(), key=_verify_pepper
+    ).digest()
+    with _verify_lock:
+        cached = _verify_cache.get(key)
+    if cached is not None:
+        return cached
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(_normalize_password(plain_password), hashed_password)
+    if pwd_context.identify(hashed_password) == "bcrypt":
+        plain_password = _normalize_password(plain_password)
+    with _kdf_slots:
+        ok = pwd_context.verify(plain_password, hashed_password)
+    with _verify_lock:
+        _verify_cache[key] = ok
+    return ok
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True if the hash uses a deprecated scheme or outdated parameters."""
+    return pwd_context.needs_update(hashed_password)
 
 # ── JWT tokens ──────────────────────────────────────────
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    expire = now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    # "iat" lets tokens issued before an account change be told apart later
+    to_encode.update({"iat": now, "exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# ── Password reset tokens ───────────────────────────────
+# Reset tokens are stateless JWTs. They carry a fingerprint of the password hash
+# they were issued against, so they stop working once the password changes —
+# which makes each one single-use without storing anything.
+RESET_TOKEN_EXPIRE_MINUTES = 60
+_RESET_PURPOSE = "pwreset"
+
+def _password_fingerprint(hashed_password: Optional[str]) -> str:
+    # Accounts without a password (OAuth) fingerprint "" so they can set one;
+    # the token still dies once a hash exists
+    return hashlib.sha256((hashed_password or "").encode()).hexdigest()[:16]
+
+def create_reset_token(user_id: int, hashed_password: Optional[str]) -> str:
+    return create_access_token(
+        {"sub": str(user_id), "purpose": _RESET_PURPOSE, "pwd": _password_fingerprint(hashed_password)},
+        expires_delta=timedelta(minutes=RESET_TOKEN_EXPIRE_MINUTES),
+    )
+
+def decode_reset_token(token: str) -> Tuple[int, str]:
+    """
+    Return (user_id, password fingerprint) from a reset token.
+    Raises ValueError with a client-facing message if it is invalid or expired.
+    """
+    try:
+        payload = jwt.decode(
+            token, SECRET_KEY, algorithms=[ALGORITHM],
+            options={"require": ["exp", "sub", "purpose", "pwd"]},
+        )
+    except jwt.ExpiredSignatureError:
+        raise ValueError("Token expired")
+    except jwt.InvalidTokenError:
+        raise ValueError("Invalid token")
+    if payload["purpose"] != _RESET_PURPOSE:
+        raise ValueError("Invalid token")
+    try:
+        return int(payload["sub"]), payload["pwd"]
+    except (TypeError, ValueError):
+        raise ValueError("Invalid token")
+
+def reset_token_matches(fingerprint: str, hashed_password: Optional[str]) -> bool:
+    """True if the token was issued against the user's current password."""
+    return hmac.compare_digest(fingerprint, _password_fingerprint(hashed_password))
+
+# ── Auth cache ──────────────────────────────────────────
+# Decoded payloads are keyed by a SHA-256 of the raw token (the token itself is
+# never stored); user snapshots are keyed by user id so they can be evicted when
+# account details change. Rejected tokens are remembered under the same key.
+# All are per-process and short-lived. JWT_CACHE_TTL=0 turns caching off.
+AUTH_CACHE_TTL = int(os.getenv("JWT_CACHE_TTL", "30"))  # seconds
+
+_payload_cache: TTLCache = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL)
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL)
+_invalid_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=AUTH_CACHE_TTL)
+_cache_lock = threading.Lock()  # sync dependencies run on the threadpool
+
+
+class CurrentUser(NamedTuple):
+    """Snapshot of the authenticated user, safe to share across sessions."""
+    id: int
+    username: str
+    email: str
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop the cached snapshot for a user after their account details change."""
+    with _cache_lock:
+        _user_cache.pop(user_id, None)
+
+
+def _decode_token(token: str) -> Optional[dict]:
+    """Verify a JWT, reusing a recently verified payload when possible.
+
+    Only access tokens (no purpose claim) with an exp and an integer sub are
+    accepted. Rejected tokens are remembered too, so a client retrying a bad or
+    expired token costs one decode rather than one per request.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    with _cache_lock:
+        if key in _invalid_token_cache:
+            return None
+        payload = _payload_cache.get(key)
+
+    if payload is None:
+        try:
+            payload = jwt.decode(
+                token, SECRET_KEY, algorithms=[ALGORITHM],
+                options={"require": ["exp", "sub"]},
+            )
+            int(payload["sub"])
+            if "purpose" in payload:  # e.g. a password reset token
+                raise ValueError("not an access token")
+        except (jwt.InvalidTokenError, TypeError, ValueError):
+            with _cache_lock:
+                _invalid_token_cache[key] = True
+            return None
+        with _cache_lock:
+            _payload_cache[key] = payload
+    elif payload["exp"] <= time.time():
+        # Cached entries may outlive the token itself
+        return None
+    return payload
+
 # ── FastAPI dependency ──────────────────────────────────
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 def get_current_user(
     token: Optional[str] = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
-) -> Optional[models.User]:
+) -> Optional[CurrentUser]:
     """Extract user from Bearer token. Returns None if no/invalid token."""
     if not token:
         return None
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            return None
-    except JWTError:
+    payload = _decode_token(token)
+    if payload is None:
         return None
-    
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user_id = int(payload["sub"])
+
+    with _cache_lock:
+        user = _user_cache.get(user_id)
+    if user is None:
+        row = db.execute(
+            select(models.User.id, models.User.username, models.User.email)
+            .where(models.User.id == user_id)
+        ).first()
+        # Hand the connection back now: the endpoint runs in a later threadpool
+        # hop, and holding a connection across hops can starve the pool
+        db.rollback()
+        if row is None:
+            return None
+        user = CurrentUser(*row)
+        with _cache_lock:
+            _user_cache[user_id] = user
     return user
 
 def require_user(
-    user: Optional[models.User] = Depends(get_current_user),
-) -> models.User:
+    user: Optional[CurrentUser] = Depends(get_current_user),
+) -> CurrentUser:
     """Dependency that enforces authentication — raises 401 if not logged in."""
     if user is None:
         raise HTTPException(
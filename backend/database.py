@@ -1,16 +1,63 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import logging
 import os
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Default to the environment variable DATABASE_URL
 # DATABASE_URL is expected to be provided via environment variables (e.g., from .env)
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# Connection pool — SQLAlchemy's defaults (5 + 10 overflow, no pre-ping) are too
+# small for FastAPI's threadpool and hand out dead connections after idle periods.
+# SQLite uses a different pool class, so these only apply to server databases.
+# Every uvicorn worker has its own pool, so the defaults split a 20 + 20 budget
+# across WEB_CONCURRENCY workers to keep the per-instance total the same.
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+engine_kwargs = {}
+if not DATABASE_URL.startswith("sqlite"):
+    per_worker = str(max(2, 20 // WEB_CONCURRENCY))
+    engine_kwargs.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", per_worker)),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", per_worker)),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "10")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_pre_ping=True,
+    )
+
+def _json_dumps(value) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+# JSON columns hold multi-MB model artifacts; orjson (de)serializes them several
+# times faster than the stdlib json module SQLAlchemy uses by default.
+engine = create_engine(
+    DATABASE_URL,
+    json_serializer=_json_dumps,
+    json_deserializer=orjson.loads,
+    **engine_kwargs,
+)
+
+if engine_kwargs:
+    _pool_overflowing = False
+
+    @event.listens_for(engine, "checkout")
+    def _log_pool_overflow(dbapi_connection, connection_record, connection_proxy):
+        """Log when checkouts start/stop spilling past pool_size, to tune the pool."""
+        global _pool_overflowing
+        overflow = engine.pool.overflow()
+        if overflow > 0 and not _pool_overflowing:
+            _pool_overflowing = True
+            logger.info("DB pool overflowing: %d connection(s) beyond pool_size", overflow)
+        elif overflow <= 0 and _pool_overflowing:
+            _pool_overflowing = False
+            logger.info("DB pool back within pool_size")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
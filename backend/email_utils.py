@@ -1,7 +1,9 @@
+import asyncio
 import os
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from pydantic import EmailStr
-from typing import List, Optional
+from email.message import EmailMessage
+
+import aiosmtplib
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -20,28 +22,79 @@ VALIDATE_CERTS = True
 # Check if credentials are provided for actual sending
 USE_EMAIL_SERVICE = bool(MAIL_USERNAME and MAIL_PASSWORD)
 
-conf = None
-if USE_EMAIL_SERVICE:
-    conf = ConnectionConfig(
-        MAIL_USERNAME=MAIL_USERNAME,
-        MAIL_PASSWORD=MAIL_PASSWORD,
-        MAIL_FROM=MAIL_FROM,
-        MAIL_PORT=MAIL_PORT,
-        MAIL_SERVER=MAIL_SERVER,
-        MAIL_STARTTLS=MAIL_STARTTLS,
-        MAIL_SSL_TLS=MAIL_SSL_TLS,
-        USE_CREDENTIALS=USE_CREDENTIALS,
-        VALIDATE_CERTS=VALIDATE_CERTS
+# ── Shared SMTP session ────────────────────────────────
+# Opening a TLS + AUTH session costs seconds with most providers, so each worker
+# keeps one authenticated connection and reuses it for every send.
+_smtp: Optional[aiosmtplib.SMTP] = None
+_smtp_lock: Optional[asyncio.Lock] = None  # created lazily inside the running loop
+
+
+async def _get_smtp() -> aiosmtplib.SMTP:
+    """Return the shared SMTP client, reconnecting if the server dropped it."""
+    global _smtp
+    if _smtp is not None and _smtp.is_connected:
+        try:
+            await _smtp.noop()
+            return _smtp
+        except aiosmtplib.SMTPException:
+            _smtp.close()
+        _smtp = None
+
+    # Only publish the client once it is connected and authenticated, so a
+    # failed login doesn't leave a half-open session for later sends to reuse
+    smtp = aiosmtplib.SMTP(
+        hostname=MAIL_SERVER,
+        port=MAIL_PORT,
+        use_tls=MAIL_SSL_TLS,
+        start_tls=MAIL_STARTTLS,
+        validate_certs=VALIDATE_CERTS,
     )
+    try:
+        await smtp.connect()
+        if USE_CREDENTIALS:
+            await smtp.login(MAIL_USERNAME, MAIL_PASSWORD)
+    except BaseException:
+        smtp.close()
+        raise
+    _smtp = smtp
+    return _smtp
 
-async def send_reset_email(to_email: str, reset_link: str):
-    """
-    Sends a password reset email.
-    If credentials are not configured, logs the link to console.
-    """
-    subject = "Password Reset Request"
 
-    html = f"""
+async def _send_html(to_email: str, subject: str, html: str):
+    """Send an HTML email over the shared SMTP session."""
+    global _smtp_lock
+    if _smtp_lock is None:
+        _smtp_lock = asyncio.Lock()
+
+    message = EmailMessage()
+    message["From"] = MAIL_FROM
+    message["To"] = to_email
+    message["Subject"] = subject
+    message.set_content(html, subtype="html")
+
+    async with _smtp_lock:
+        smtp = await _get_smtp()
+        try:
+            await smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # Dropped between the health check and the send — retry once
+            smtp = await _get_smtp()
+            await smtp.send_message(message)
+
+
+async def close_smtp():
+    """Close the shared SMTP session (called on app shutdown)."""
+    global _smtp
+    if _smtp is not None and _smtp.is_connected:
+        try:
+            await _smtp.quit()
+        except aiosmtplib.SMTPException:
+            _smtp.close()
+    _smtp = None
+
+# ── Templates ──────────────────────────────────────────
+# Built once at import; each send only fills in the placeholders.
+_RESET_HTML = """
     <html>
         <body>
             <p>Hello,</p>
@@ -59,15 +112,46 @@ async def send_reset_email(to_email: str, reset_link: str):
     </html>
     """
 
-    if USE_EMAIL_SERVICE and conf:
-        message = MessageSchema(
-            subject=subject,
-            recipients=[to_email],
-            body=html,
-            subtype=MessageType.html
-        )
-        fm = FastMail(conf)
-        await fm.send_message(message)
+_PASSWORD_CHANGED_HTML = """
+    <html>
+        <body>
+            <p>Hello {username},</p>
+            <p>Your password for your ML Hand Gesture account was just changed.</p>
+            <p>If you made this change, no further action is needed.</p>
+            <p>If you did <strong>not</strong> make this change, please reset your password immediately or contact support.</p>
+            <br>
+            <p>— ML Hand Gesture Team</p>
+        </body>
+    </html>
+    """
+
+_USERNAME_CHANGED_HTML = """
+    <html>
+        <body>
+            <p>Hello,</p>
+            <p>Your username for your ML Hand Gesture account was just changed.</p>
+            <p><strong>Old username:</strong> {old_username}</p>
+            <p><strong>New username:</strong> {new_username}</p>
+            <p>If you made this change, no further action is needed.</p>
+            <p>If you did <strong>not</strong> make this change, please secure your account immediately.</p>
+            <br>
+            <p>— ML Hand Gesture Team</p>
+        </body>
+    </html>
+    """
+
+
+async def send_reset_email(to_email: str, reset_link: str):
+    """
+    Sends a password reset email.
+    If credentials are not configured, logs the link to console.
+    """
+    subject = "Password Reset Request"
+
+    html = _RESET_HTML.format(reset_link=reset_link)
+
+    if USE_EMAIL_SERVICE:
+        await _send_html(to_email, subject, html)
         print(f"Email sent to {to_email}")
     else:
         print(f"\n==========================================")
@@ -82,28 +166,10 @@ async def send_password_changed_email(to_email: str, username: str):
     """Notifies the user that their password was changed."""
     subject = "Your Password Was Changed"
 
-    html = f"""
-    <html>
-        <body>
-            <p>Hello {username},</p>
-            <p>Your password for your ML Hand Gesture account was just changed.</p>
-            <p>If you made this change, no further action is needed.</p>
-            <p>If you did <strong>not</strong> make this change, please reset your password immediately or contact support.</p>
-            <br>
-            <p>— ML Hand Gesture Team</p>
-        </body>
-    </html>
-    """
+    html = _PASSWORD_CHANGED_HTML.format(username=username)
 
-    if USE_EMAIL_SERVICE and conf:
-        message = MessageSchema(
-            subject=subject,
-            recipients=[to_email],
-            body=html,
-            subtype=MessageType.html
-        )
-        fm = FastMail(conf)
-        await fm.send_message(message)
+    if USE_EMAIL_SERVICE:
+        await _send_html(to_email, subject, html)
         print(f"Password changed email sent to {to_email}")
     else:
         print(f"\n==========================================")
@@ -117,30 +183,10 @@ async def send_username_changed_email(to_email: str, old_username: str, new_user
     """Notifies the user that their username was changed."""
     subject = "Your Username Was Changed"
 
-    html = f"""
-    <html>
-        <body>
-            <p>Hello,</p>
-            <p>Your username for your ML Hand Gesture account was just changed.</p>
-            <p><strong>Old username:</strong> {old_username}</p>
-            <p><strong>New username:</strong> {new_username}</p>
-            <p>If you made this change, no further action is needed.</p>
-            <p>If you did <strong>not</strong> make this change, please secure your account immediately.</p>
-            <br>
-            <p>— ML Hand Gesture Team</p>
-        </body>
-    </html>
-    """
+    html = _USERNAME_CHANGED_HTML.format(old_username=old_username, new_username=new_username)
 
-    if USE_EMAIL_SERVICE and conf:
-        message = MessageSchema(
-            subject=subject,
-            recipients=[to_email],
-            body=html,
-            subtype=MessageType.html
-        )
-        fm = FastMail(conf)
-        await fm.send_message(message)
+    if USE_EMAIL_SERVICE:
+        await _send_html(to_email, subject, html)
         print(f"Username changed email sent to {to_email}")
     else:
         print(f"\n==========================================")
@@ -17,50 +17,129 @@ Endpoints:
   POST /piano               — Save a piano sequence
 """
 
+import base64
+import binascii
+import hashlib
 import os
-from fastapi import FastAPI, Depends, HTTPException, Query, Request
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime
+import orjson
+from cachetools import TTLCache
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
-from sqlalchemy.orm import Session
+from sqlalchemy import Text, cast, delete, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, contains_eager
 from database import engine, get_db
 import models
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional, Any
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import List, Optional, Any, Tuple
 from auth import (
     hash_password,
     verify_password,
+    needs_rehash,
     validate_password,
     create_access_token,
+    create_reset_token,
+    decode_reset_token,
+    reset_token_matches,
     require_user,
     get_current_user,
+    invalidate_user,
+    CurrentUser,
 )
-from email_utils import send_reset_email, send_password_changed_email, send_username_changed_email
+from email_utils import send_reset_email, send_password_changed_email, send_username_changed_email, close_smtp
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
+# Create tables — only when asked (local dev). Deployed databases are managed by
+# add_public_columns.py so worker cold starts skip the per-table existence checks.
+if os.getenv("AUTO_CREATE_TABLES") == "1":
+    models.Base.metadata.create_all(bind=engine)
 
 # ── Rate Limiter ───────────────────────────────────────
-limiter = Limiter(key_func=get_remote_address)
+# Number of reverse proxies in front of the app that append the client address
+# to X-Forwarded-For (Cloud Run: 1). Entries left of those were written by the
+# client and can't be trusted, so only the right-most appended one is used.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+def client_ip(request: Request) -> str:
+    """Rate-limit key: the address the nearest trusted proxy saw."""
+    if TRUSTED_PROXY_HOPS > 0:
+        hops = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+        if len(hops) >= TRUSTED_PROXY_HOPS:
+            return hops[-TRUSTED_PROXY_HOPS]
+    return get_remote_address(request)
+
+# Counters live in each worker's memory unless RATE_LIMIT_STORAGE_URI points at
+# shared storage (e.g. redis://host:6379), which makes limits hold across workers
+limiter = Limiter(
+    key_func=client_ip,
+    storage_uri=os.getenv("RATE_LIMIT_STORAGE_URI", "memory://"),
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_smtp()
+
+# orjson renders responses several times faster than stdlib json, which matters
+# for the multi-MB model_data payloads served by /models/{id}
+app = FastAPI(title="Hand Pose Trainer API", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is parsed by orjson instead of the json module."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI
+            # still turns malformed bodies into a 422
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """Route class that hands endpoints an ORJSONRequest — saves parse time and
+    garbage on the multi-MB model and dataset uploads."""
 
-app = FastAPI(title="Hand Pose Trainer API")
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return route_handler
+
+
+# Must be set before any route is declared
+app.router.route_class = ORJSONRoute
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # CORS — allow frontend dev server and production domains
 # CORS and Frontend settings from environment
-origins = os.getenv("ALLOWED_ORIGINS", "").split(",")
+# Deduplicated set: CORSMiddleware checks every request's Origin against it
+origins = frozenset(o.strip() for o in os.getenv("ALLOWED_ORIGINS", "").split(",") if o.strip())
 FRONTEND_URL = os.getenv("FRONTEND_URL")
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Exactly what the frontend uses, so browsers can cache preflights;
+    # If-None-Match/ETag let scripts make conditional GETs themselves
+    allow_methods=["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type", "If-None-Match"],
+    expose_headers=["X-Next-Cursor", "ETag"],
+    max_age=86400,  # browsers clamp this to their own limit (e.g. 2h in Chrome)
 )
 
 
@@ -76,6 +155,10 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(SecurityHeadersMiddleware)
 
+# Model payloads (TF.js topology, base64 weightData, datasets) compress well;
+# small responses aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 # ══════════════════════════════════════════════════════════
 # Pydantic Schemas
@@ -100,8 +183,7 @@ class UserResponse(BaseModel):
     username: str
     email: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ModelSaveRequest(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -111,9 +193,7 @@ class ModelSaveRequest(BaseModel):
     dataset: Optional[dict] = None # { features: [], labels: [] }
     is_public: bool = False
 
-    model_config = {
-        "protected_namespaces": ()
-    }
+    model_config = ConfigDict(protected_namespaces=())
 
 class ModelListItem(BaseModel):
     id: int
@@ -121,19 +201,16 @@ class ModelListItem(BaseModel):
     description: Optional[str]
     class_names: list
     is_public: bool
-    created_at: str
+    created_at: datetime
     author: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ModelDetail(ModelListItem):
     model_data: dict
     dataset: Optional[dict]
 
-    model_config = {
-        "protected_namespaces": ()
-    }
+    model_config = ConfigDict(protected_namespaces=())
 
 class GestureMappingSchema(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -151,7 +228,7 @@ class ResourceResponse(BaseModel):
     data: Optional[dict] = None
     is_active: bool
     is_public: bool = False
-    created_at: str
+    created_at: datetime
     author: str
 
 # ══════════════════════════════════════════════════════════
@@ -176,26 +253,26 @@ def signup(request: Request, req: SignupRequest, db: Session = Depends(get_db)):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    # Check existing
-    existing = db.query(models.User).filter(
-        (models.User.email == req.email) | (models.User.username == req.username)
-    ).first()
-    if existing:
+    # Insert in one round-trip; the unique indexes on email/username reject
+    # duplicates atomically (no SELECT-then-INSERT race)
+    user_id = db.execute(
+        pg_insert(models.User)
+        .values(
+            username=req.username,
+            email=req.email,
+            hashed_password=hash_password(req.password),
+        )
+        .on_conflict_do_nothing()
+        .returning(models.User.id)
+    ).scalar_one_or_none()
+    if user_id is None:
         raise HTTPException(status_code=400, detail="Username or email already registered")
-
-    user = models.User(
-        username=req.username,
-        email=req.email,
-        hashed_password=hash_password(req.password),
-    )
-    db.add(user)
     db.commit()
-    db.refresh(user)
 
-    token = create_access_token({"sub": str(user.id)})
+    token = create_access_token({"sub": str(user_id)})
     return TokenResponse(
         access_token=token,
-        user={"id": user.id, "username": user.username, "email": user.email},
+        user={"id": user_id, "username": req.username, "email": req.email},
     )
 
 
@@ -206,6 +283,11 @@ def login(request: Request, req: LoginRequest, db: Session = Depends(get_db)):
     if not user or not user.hashed_password or not verify_password(req.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    # Transparently upgrade legacy bcrypt hashes to argon2
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = hash_password(req.password)
+        db.commit()
+
     token = create_access_token({"sub": str(user.id)})
     return TokenResponse(
         access_token=token,
@@ -214,10 +296,21 @@ def login(request: Request, req: LoginRequest, db: Session = Depends(get_db)):
 
 
 @app.get("/auth/me", response_model=UserResponse)
-def get_me(user: models.User = Depends(require_user)):
+def get_me(user: CurrentUser = Depends(require_user)):
     return user
 
 
+async def send_email_quietly(send, *args):
+    """
+    Background-task wrapper for the email_utils senders — runs after the
+    response is sent and logs failures instead of raising.
+    """
+    try:
+        await send(*args)
+    except Exception as e:
+        print(f"Failed to send email ({send.__name__}): {e}")
+
+
 class UpdateProfileRequest(BaseModel):
     username: Optional[str] = Field(None, max_length=50)
 
@@ -227,7 +320,11 @@ class UpdatePasswordRequest(BaseModel):
 
 
 @app.patch("/auth/profile", response_model=UserResponse)
-async def update_profile(req: UpdateProfileRequest, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
+def update_profile(req: UpdateProfileRequest, background_tasks: BackgroundTasks, current_user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
+    user = db.get(models.User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
     old_username = user.username
     if req.username is not None:
         trimmed = req.username.strip()
@@ -244,19 +341,25 @@ async def update_profile(req: UpdateProfileRequest, user: models.User = Depends(
 
     db.commit()
     db.refresh(user)
+    invalidate_user(user.id)
+    if old_username != user.username:
+        # cached entries carry the author name
+        invalidate_model_caches()
+        invalidate_config_caches()
 
     # Send notification email if username actually changed
     if req.username is not None and old_username != user.username:
-        try:
-            await send_username_changed_email(user.email, old_username, user.username)
-        except Exception as e:
-            print(f"Failed to send username change email: {e}")
+        background_tasks.add_task(send_email_quietly, send_username_changed_email, user.email, old_username, user.username)
 
     return user
 
 
 @app.post("/auth/password")
-async def update_password(req: UpdatePasswordRequest, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
+def update_password(req: UpdatePasswordRequest, background_tasks: BackgroundTasks, current_user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
+    user = db.get(models.User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
     # Verify current password
     if not verify_password(req.current_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
@@ -269,12 +372,10 @@ async def update_password(req: UpdatePasswordRequest, user: models.User = Depend
 
     user.hashed_password = hash_password(req.new_password)
     db.commit()
+    invalidate_user(user.id)
 
     # Send notification email
-    try:
-        await send_password_changed_email(user.email, user.username)
-    except Exception as e:
-        print(f"Failed to send password change email: {e}")
+    background_tasks.add_task(send_email_quietly, send_password_changed_email, user.email, user.username)
 
     return {"detail": "Password updated successfully"}
 
@@ -283,34 +384,23 @@ class ForgotPasswordRequest(BaseModel):
     email: str = Field(..., max_length=255)
 
 class ResetPasswordRequest(BaseModel):
-    token: str = Field(..., max_length=255)
+    token: str = Field(..., max_length=512)
     new_password: str = Field(..., min_length=8, max_length=128)
 
 @app.post("/auth/forgot-password")
 @limiter.limit("3/minute")
-async def forgot_password(request: Request, req: ForgotPasswordRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == req.email).first()
+def forgot_password(request: Request, req: ForgotPasswordRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    user = db.execute(
+        select(models.User.id, models.User.hashed_password).where(models.User.email == req.email)
+    ).first()
     if not user:
         # Don't reveal if user exists
         return {"detail": "If that email exists, a reset link has been sent."}
 
-    # Generate token
-    import uuid
-    from datetime import datetime, timedelta
-    
-    token = str(uuid.uuid4())
-    expires = datetime.utcnow() + timedelta(hours=1)
-    
-    reset_token = models.PasswordResetToken(
-        user_id=user.id,
-        token=token,
-        expires_at=expires
-    )
-    db.add(reset_token)
-    db.commit()
-
+    # Stateless token — nothing is written to the database
+    token = create_reset_token(user.id, user.hashed_password)
     reset_link = f"{FRONTEND_URL}/reset-password?token={token}"
-    await send_reset_email(req.email, reset_link)
+    background_tasks.add_task(send_email_quietly, send_reset_email, req.email, reset_link)
 
     return {"detail": "If that email exists, a reset link has been sent."}
 
@@ -318,22 +408,20 @@ async def forgot_password(request: Request, req: ForgotPasswordRequest, db: Sess
 @app.post("/auth/reset-password")
 @limiter.limit("5/minute")
 def reset_password(request: Request, req: ResetPasswordRequest, db: Session = Depends(get_db)):
-    from datetime import datetime
-    
-    reset_token = db.query(models.PasswordResetToken).filter(
-        models.PasswordResetToken.token == req.token
-    ).first()
-
-    if not reset_token:
-        raise HTTPException(status_code=400, detail="Invalid token")
-
-    if reset_token.expires_at < datetime.utcnow():
-        raise HTTPException(status_code=400, detail="Token expired")
+    try:
+        user_id, fingerprint = decode_reset_token(req.token)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    user = db.query(models.User).filter(models.User.id == reset_token.user_id).first()
+    user = db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # The token is bound to the password it was issued against, so it can't be
+    # replayed once the password has changed
+    if not reset_token_matches(fingerprint, user.hashed_password):
+        raise HTTPException(status_code=400, detail="Invalid token")
+
     # Enforce password strength
     try:
         validate_password(req.new_password)
@@ -342,10 +430,8 @@ def reset_password(request: Request, req: ResetPasswordRequest, db: Session = De
 
     # Update password
     user.hashed_password = hash_password(req.new_password)
-    
-    # Delete usage of this token (consume it)
-    db.delete(reset_token)
     db.commit()
+    invalidate_user(user.id)
 
     return {"detail": "Password updated successfully"}
 
@@ -353,109 +439,236 @@ def reset_password(request: Request, req: ResetPasswordRequest, db: Session = De
 # Model Endpoints
 # ══════════════════════════════════════════════════════════
 
+# Public read caches — per process, short TTL. Entries are the serialized JSON
+# bodies, so a hit skips the query, validation and encoding alike. Writes that
+# can change a cached response evict it locally; other workers catch up when
+# the TTL expires.
+_community_models_cache: TTLCache = TTLCache(maxsize=256, ttl=30)
+_public_model_cache: TTLCache = TTLCache(maxsize=16, ttl=60)  # entries can be MBs
+_response_cache_lock = threading.Lock()
+
+_community_gestures_cache: TTLCache = TTLCache(maxsize=256, ttl=30)
+_community_piano_cache: TTLCache = TTLCache(maxsize=256, ttl=30)
+
+def invalidate_model_caches(model_id: Optional[int] = None) -> None:
+    """Evict cached community pages and (optionally) one cached model detail."""
+    with _response_cache_lock:
+        _community_models_cache.clear()
+        if model_id is None:
+            _public_model_cache.clear()
+        else:
+            _public_model_cache.pop(model_id, None)
+
+def invalidate_config_caches() -> None:
+    """Evict cached gesture and piano community pages."""
+    with _response_cache_lock:
+        _community_gestures_cache.clear()
+        _community_piano_cache.clear()
+
+def make_etag(body: bytes) -> str:
+    # Weak: GZipMiddleware may re-encode the bytes on the wire
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def conditional_json_response(request: Request, body: bytes, etag: str, headers: Optional[dict] = None) -> Response:
+    """
+    Serve a JSON body with an ETag, or an empty 304 if the client already has it.
+    no-cache lets browsers keep the body but revalidate on every use.
+    """
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or etag.removeprefix("W/") in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Columns needed to build a ModelListItem — list queries select only these so
+# the (potentially multi-MB) model_data/dataset blobs are never fetched.
+MODEL_LIST_COLUMNS = (
+    models.SavedModel.id,
+    models.SavedModel.name,
+    models.SavedModel.description,
+    models.SavedModel.class_names,
+    models.SavedModel.is_public,
+    models.SavedModel.created_at,
+)
+
+def split_weight_data(model_data: dict) -> Tuple[dict, Optional[bytes]]:
+    """
+    Pull the base64 weightData out of a TF.js artifact dict so it can be stored
+    as raw bytes. Falls back to keeping it inline if it doesn't round-trip.
+    """
+    weights = model_data.get("weightData")
+    if not isinstance(weights, str):
+        return model_data, None
+    try:
+        raw = base64.b64decode(weights, validate=True)
+    except binascii.Error:
+        return model_data, None
+    if base64.b64encode(raw).decode() != weights:
+        return model_data, None
+    return {k: v for k, v in model_data.items() if k != "weightData"}, raw
+
+def join_weight_data(model_data_json: Optional[str], weight_data: Optional[bytes]) -> bytes:
+    """
+    Inverse of split_weight_data, on serialized JSON: splice the base64
+    weightData back into the stored model_data object text without parsing it.
+    """
+    if model_data_json is None:
+        return b"null"
+    body = model_data_json.encode()
+    if weight_data is None:
+        return body
+    inner = body.rstrip()[:-1].rstrip()  # drop the closing brace
+    sep = b"" if inner.endswith(b"{") else b","
+    return inner + sep + b'"weightData":"' + base64.b64encode(weight_data) + b'"}'
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor pointing just past the given (created_at, id) row."""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def contains_pattern(search: str) -> str:
+    """
+    ILIKE pattern matching `search` literally anywhere (use with escape="\\").
+    Escaping keeps a search for "%" or "_" from matching every row; the trigram
+    indexes serve these patterns on Postgres.
+    """
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
 @app.get("/models/my", response_model=List[ModelListItem])
-def list_my_models(user: models.User = Depends(require_user), db: Session = Depends(get_db)):
+def list_my_models(user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
     results = (
-        db.query(models.SavedModel)
+        db.query(*MODEL_LIST_COLUMNS)
         .filter(models.SavedModel.user_id == user.id)
         .order_by(models.SavedModel.created_at.desc())
         .all()
     )
-    return [
-        ModelListItem(
-            id=m.id,
-            name=m.name,
-            description=m.description,
-            class_names=m.class_names,
-            is_public=m.is_public,
-            created_at=m.created_at.isoformat(),
-            author=user.username,
-        )
-        for m in results
-    ]
+    # Trusted column values as plain dicts; returning a Response skips
+    # response_model validation (it still documents the shape)
+    return ORJSONResponse([dict(m._mapping, author=user.username) for m in results])
 
 
 @app.post("/models/save", response_model=ModelListItem)
-def save_model(req: ModelSaveRequest, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
+def save_model(req: ModelSaveRequest, user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
     # Upsert — if user already has a model with this name, update it
-    existing = (
-        db.query(models.SavedModel)
-        .filter(models.SavedModel.user_id == user.id, models.SavedModel.name == req.name)
-        .first()
+    model_data, weight_data = split_weight_data(req.model_data)
+    stmt = pg_insert(models.SavedModel).values(
+        user_id=user.id,
+        name=req.name,
+        description=req.description,
+        class_names=req.class_names,
+        model_data=model_data,
+        weight_data=weight_data,
+        dataset=req.dataset,
+        is_public=req.is_public,
     )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.SavedModel.user_id, models.SavedModel.name],
+        set_={
+            col: stmt.excluded[col]
+            for col in ("description", "class_names", "model_data", "weight_data", "dataset", "is_public", "updated_at")
+        },
+    ).returning(*MODEL_LIST_COLUMNS)
+    m = db.execute(stmt).one()
+    db.commit()
 
-    if existing:
-        existing.description = req.description
-        existing.class_names = req.class_names
-        existing.model_data = req.model_data
-        existing.dataset = req.dataset
-        existing.is_public = req.is_public
-        db.commit()
-        db.refresh(existing)
-        m = existing
-    else:
-        m = models.SavedModel(
-            user_id=user.id,
-            name=req.name,
-            description=req.description,
-            class_names=req.class_names,
-            model_data=req.model_data,
-            dataset=req.dataset,
-            is_public=req.is_public,
-        )
-        db.add(m)
-        db.commit()
-        db.refresh(m)
-
-    return ModelListItem(
-        id=m.id,
-        name=m.name,
-        description=m.description,
-        class_names=m.class_names,
-        is_public=m.is_public,
-        created_at=m.created_at.isoformat(),
-        author=user.username,
-    )
+    invalidate_model_caches(m.id)
+
+    return ModelListItem.model_construct(**m._mapping, author=user.username)
 
 
 @app.get("/models/community", response_model=List[ModelListItem])
 def list_community_models(
-    search: Optional[str] = Query(None),
+    request: Request,
+    search: Optional[str] = Query(None, max_length=100),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
 ):
-    query = (
-        db.query(models.SavedModel)
-        .join(models.User)
-        .filter(models.SavedModel.is_public == True)
-    )
-    if search:
-        query = query.filter(models.SavedModel.name.ilike(f"%{search}%"))
-
-    results = query.order_by(models.SavedModel.created_at.desc()).offset(offset).limit(limit).all()
-
-    return [
-        ModelListItem(
-            id=m.id,
-            name=m.name,
-            description=m.description,
-            class_names=m.class_names,
-            is_public=m.is_public,
-            created_at=m.created_at.isoformat(),
-            author=m.user.username,
+    """
+    Public models, newest first. Pass the X-Next-Cursor header from one page as
+    `cursor` to get the next; unlike `offset`, that stays an index range scan
+    however deep the page is.
+    """
+    cache_key = (search, limit, cursor or offset)
+    with _response_cache_lock:
+        cached = _community_models_cache.get(cache_key)
+    if cached is None:
+        query = (
+            db.query(*MODEL_LIST_COLUMNS, models.User.username.label("author"))
+            .join(models.User)
+            .filter(models.SavedModel.is_public == True)
         )
-        for m in results
-    ]
+        if search:
+            query = query.filter(models.SavedModel.name.ilike(contains_pattern(search), escape="\\"))
+        query = query.order_by(models.SavedModel.created_at.desc(), models.SavedModel.id.desc())
+        if cursor:
+            query = query.filter(
+                tuple_(models.SavedModel.created_at, models.SavedModel.id) < decode_cursor(cursor)
+            )
+        else:
+            query = query.offset(offset)
+
+        results = query.limit(limit).all()
+        next_cursor = encode_cursor(results[-1].created_at, results[-1].id) if len(results) == limit else None
+        body = orjson.dumps([dict(m._mapping) for m in results])
+        cached = (body, make_etag(body), next_cursor)
+        with _response_cache_lock:
+            _community_models_cache[cache_key] = cached
+
+    body, etag, next_cursor = cached
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return conditional_json_response(request, body, etag, headers)
 
 
 @app.get("/models/{model_id}", response_model=ModelDetail)
 def get_model(
     model_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: Optional[models.User] = Depends(get_current_user),
+    current_user: Optional[CurrentUser] = Depends(get_current_user),
 ):
-    m = db.query(models.SavedModel).filter(models.SavedModel.id == model_id).first()
+    # Only public models are cached. Other workers don't see this worker's
+    # invalidations, so a hit re-reads is_public and updated_at (no blobs)
+    # before serving; a model made private, re-saved or deleted elsewhere falls
+    # through to the full path and its access checks.
+    with _response_cache_lock:
+        cached = _public_model_cache.get(model_id)
+    if cached is not None:
+        body, etag, updated_at = cached
+        current = db.execute(
+            select(models.SavedModel.is_public, models.SavedModel.updated_at)
+            .where(models.SavedModel.id == model_id)
+        ).first()
+        if current is not None and current.is_public and current.updated_at == updated_at:
+            return conditional_json_response(request, body, etag)
+        with _response_cache_lock:
+            _public_model_cache.pop(model_id, None)
+
+    # model_data/dataset come back as the JSON text Postgres stores and are
+    # spliced into the body as-is — multi-MB blobs are never parsed or re-encoded
+    m = db.execute(
+        select(
+            *MODEL_LIST_COLUMNS,
+            models.SavedModel.user_id,
+            models.User.username.label("author"),
+            cast(models.SavedModel.model_data, Text).label("model_data_json"),
+            cast(models.SavedModel.dataset, Text).label("dataset_json"),
+            models.SavedModel.weight_data,
+            models.SavedModel.updated_at,
+        )
+        .join(models.User)
+        .where(models.SavedModel.id == model_id)
+    ).first()
     if not m:
         raise HTTPException(status_code=404, detail="Model not found")
 
@@ -464,28 +677,62 @@ def get_model(
         if not current_user or current_user.id != m.user_id:
             raise HTTPException(status_code=403, detail="Access denied: this model is private")
 
-    return ModelDetail(
-        id=m.id,
-        name=m.name,
-        description=m.description,
-        class_names=m.class_names,
-        is_public=m.is_public,
-        created_at=m.created_at.isoformat(),
-        author=m.user.username,
-        model_data=m.model_data,
-        dataset=m.dataset,
-    )
+    head = orjson.dumps({field: m._mapping[field] for field in ModelListItem.model_fields})
+    body = b"".join((
+        head[:-1],  # reopen the object for the two blob fields
+        b',"model_data":', join_weight_data(m.model_data_json, m.weight_data),
+        b',"dataset":', (m.dataset_json or "null").encode(),
+        b"}",
+    ))
+    etag = make_etag(body)
+    if m.is_public:
+        with _response_cache_lock:
+            _public_model_cache[model_id] = (body, etag, m.updated_at)
+    return conditional_json_response(request, body, etag)
+
+
+@app.get("/models/{model_id}/weights")
+def get_model_weights(
+    model_id: int,
+    db: Session = Depends(get_db),
+    current_user: Optional[CurrentUser] = Depends(get_current_user),
+):
+    """
+    Raw TF.js weight bytes (the decoded weightData), for clients that fetch the
+    small JSON parts separately. Reads only the bytea column — never the
+    model_data/dataset JSON — and skips base64 + JSON encoding entirely.
+    """
+    row = db.execute(
+        select(models.SavedModel.user_id, models.SavedModel.is_public, models.SavedModel.weight_data)
+        .where(models.SavedModel.id == model_id)
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Model not found")
+    if not row.is_public:
+        if not current_user or current_user.id != row.user_id:
+            raise HTTPException(status_code=403, detail="Access denied: this model is private")
+    if row.weight_data is None:
+        raise HTTPException(status_code=404, detail="Model has no stored weights")
+    return Response(content=bytes(row.weight_data), media_type="application/octet-stream")
 
 
 @app.delete("/models/{model_id}")
-def delete_model(model_id: int, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
-    m = db.query(models.SavedModel).filter(models.SavedModel.id == model_id).first()
-    if not m:
+def delete_model(model_id: int, user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
+    # Ownership check reads one column — never the model_data/dataset blobs
+    row = db.execute(
+        select(models.SavedModel.user_id).where(models.SavedModel.id == model_id)
+    ).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Model not found")
-    if m.user_id != user.id:
+    if row.user_id != user.id:
         raise HTTPException(status_code=403, detail="Not your model")
 
+    db.execute(
+        delete(models.SavedModel)
+        .where(models.SavedModel.id == model_id, models.SavedModel.user_id == user.id)
+    )
     db.commit()
+    invalidate_model_caches(model_id)
     return {"detail": "Model deleted"}
 
 
@@ -493,16 +740,24 @@ class ModelVisibilityUpdate(BaseModel):
     is_public: bool
 
 @app.patch("/models/{model_id}/visibility")
-def update_model_visibility(model_id: int, req: ModelVisibilityUpdate, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
-    m = db.query(models.SavedModel).filter(models.SavedModel.id == model_id).first()
-    if not m:
+def update_model_visibility(model_id: int, req: ModelVisibilityUpdate, user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
+    # Same one-column ownership check as delete_model, then a bare UPDATE
+    row = db.execute(
+        select(models.SavedModel.user_id).where(models.SavedModel.id == model_id)
+    ).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Model not found")
-    if m.user_id != user.id:
+    if row.user_id != user.id:
         raise HTTPException(status_code=403, detail="Not your model")
-    
-    m.is_public = req.is_public
+
+    db.execute(
+        update(models.SavedModel)
+        .where(models.SavedModel.id == model_id, models.SavedModel.user_id == user.id)
+        .values(is_public=req.is_public)
+    )
     db.commit()
-    return {"detail": "Visibility updated", "is_public": m.is_public}
+    invalidate_model_caches(model_id)
+    return {"detail": "Visibility updated", "is_public": req.is_public}
 
 
 # ══════════════════════════════════════════════════════════
@@ -510,59 +765,61 @@ def update_model_visibility(model_id: int, req: ModelVisibilityUpdate, user: mod
 # ══════════════════════════════════════════════════════════
 
 @app.get("/gestures", response_model=List[ResourceResponse])
-def get_gestures(user: models.User = Depends(require_user), db: Session = Depends(get_db)):
+def get_gestures(user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
     results = db.query(models.GestureMapping).filter(models.GestureMapping.user_id == user.id).all()
-    return [
-        ResourceResponse(
-            id=g.id,
-            name_or_title=g.name,
-            data=g.mapping_data,
-            is_active=g.is_active,
-            is_public=g.is_public,
-            created_at=g.created_at.isoformat(),
-            author=user.username
-        )
+    return ORJSONResponse([
+        {
+            "id": g.id,
+            "name_or_title": g.name,
+            "data": g.mapping_data,
+            "is_active": g.is_active,
+            "is_public": g.is_public,
+            "created_at": g.created_at,
+            "author": user.username,
+        }
         for g in results
-    ]
+    ])
 
 @app.delete("/gestures/{map_id}")
-def delete_gesture_mapping(map_id: int, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
-    mapping = db.query(models.GestureMapping).filter(
-        models.GestureMapping.id == map_id,
-        models.GestureMapping.user_id == user.id
-    ).first()
-    if not mapping:
+def delete_gesture_mapping(map_id: int, user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
+    was_public = db.execute(
+        delete(models.GestureMapping)
+        .where(models.GestureMapping.id == map_id, models.GestureMapping.user_id == user.id)
+        .returning(models.GestureMapping.is_public)
+    ).scalar_one_or_none()
+    if was_public is None:
         raise HTTPException(status_code=404, detail="Mapping not found")
-    
-    db.delete(mapping)
     db.commit()
+    if was_public:
+        invalidate_config_caches()
     return {"detail": "Deleted successfully"}
 
 @app.post("/gestures", response_model=ResourceResponse)
-def save_gesture(req: GestureMappingSchema, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
-    # Deactivate others if this one is active
+def save_gesture(req: GestureMappingSchema, user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
+    # Deactivate the user's other mappings, then upsert by (user_id, name):
+    # two statements, one commit
+    table = models.GestureMapping
     if req.is_active:
-        db.query(models.GestureMapping).filter(models.GestureMapping.user_id == user.id).update({"is_active": False})
-    
-    # Check for existing by name to update
-    existing = db.query(models.GestureMapping).filter(models.GestureMapping.user_id == user.id, models.GestureMapping.name == req.name).first()
-    
-    if existing:
-        existing.mapping_data = req.mapping_data
-        existing.is_active = req.is_active
-        db.commit()
-        db.refresh(existing)
-        g = existing
-    else:
-        g = models.GestureMapping(
-            user_id=user.id,
-            name=req.name,
-            mapping_data=req.mapping_data,
-            is_active=req.is_active
+        db.execute(
+            update(table)
+            .where(table.user_id == user.id, table.is_active == True, table.name != req.name)
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
         )
-        db.add(g)
-        db.commit()
-        db.refresh(g)
+    stmt = pg_insert(table).values(
+        user_id=user.id,
+        name=req.name,
+        mapping_data=req.mapping_data,
+        is_active=req.is_active,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.user_id, table.name],
+        set_={"mapping_data": stmt.excluded.mapping_data, "is_active": stmt.excluded.is_active},
+    ).returning(table.id, table.name, table.mapping_data, table.is_active, table.is_public, table.created_at)
+    g = db.execute(stmt).one()
+    db.commit()
+    if g.is_public:
+        invalidate_config_caches()
 
     return ResourceResponse(
         id=g.id,
@@ -570,13 +827,13 @@ def save_gesture(req: GestureMappingSchema, user: models.User = Depends(require_
         data=g.mapping_data,
         is_active=g.is_active,
         is_public=g.is_public,
-        created_at=g.created_at.isoformat(),
+        created_at=g.created_at,
         author=user.username
     )
 
 
 @app.patch("/gestures/{map_id}/visibility")
-def update_gesture_visibility(map_id: int, req: ModelVisibilityUpdate, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
+def update_gesture_visibility(map_id: int, req: ModelVisibilityUpdate, user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
     g = db.query(models.GestureMapping).filter(models.GestureMapping.id == map_id).first()
     if not g:
         raise HTTPException(status_code=404, detail="Mapping not found")
@@ -585,27 +842,28 @@ def update_gesture_visibility(map_id: int, req: ModelVisibilityUpdate, user: mod
     
     g.is_public = req.is_public
     db.commit()
+    invalidate_config_caches()
     return {"detail": "Visibility updated", "is_public": g.is_public}
 
 
 @app.get("/piano", response_model=List[ResourceResponse])
-def get_piano_sequences(user: models.User = Depends(require_user), db: Session = Depends(get_db)):
+def get_piano_sequences(user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
     results = db.query(models.MusicSequence).filter(models.MusicSequence.user_id == user.id).all()
-    return [
-        ResourceResponse(
-            id=s.id,
-            name_or_title=s.title,
-            data=s.sequence_data,
-            is_active=s.is_active,
-            is_public=s.is_public, 
-            created_at=s.created_at.isoformat(),
-            author=user.username
-        )
+    return ORJSONResponse([
+        {
+            "id": s.id,
+            "name_or_title": s.title,
+            "data": s.sequence_data,
+            "is_active": s.is_active,
+            "is_public": s.is_public,
+            "created_at": s.created_at,
+            "author": user.username,
+        }
         for s in results
-    ]
+    ])
 
 @app.patch("/piano/{seq_id}/visibility")
-def update_piano_visibility(seq_id: int, req: ModelVisibilityUpdate, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
+def update_piano_visibility(seq_id: int, req: ModelVisibilityUpdate, user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
     s = db.query(models.MusicSequence).filter(models.MusicSequence.id == seq_id).first()
     if not s:
         raise HTTPException(status_code=404, detail="Sequence not found")
@@ -614,44 +872,48 @@ def update_piano_visibility(seq_id: int, req: ModelVisibilityUpdate, user: model
     
     s.is_public = req.is_public
     db.commit()
+    invalidate_config_caches()
     return {"detail": "Visibility updated", "is_public": s.is_public}
 
 @app.delete("/piano/{seq_id}")
-def delete_piano_sequence(seq_id: int, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
-    seq = db.query(models.MusicSequence).filter(
-        models.MusicSequence.id == seq_id,
-        models.MusicSequence.user_id == user.id
-    ).first()
-    if not seq:
+def delete_piano_sequence(seq_id: int, user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
+    was_public = db.execute(
+        delete(models.MusicSequence)
+        .where(models.MusicSequence.id == seq_id, models.MusicSequence.user_id == user.id)
+        .returning(models.MusicSequence.is_public)
+    ).scalar_one_or_none()
+    if was_public is None:
         raise HTTPException(status_code=404, detail="Sequence not found")
-    
-    db.delete(seq)
     db.commit()
+    if was_public:
+        invalidate_config_caches()
     return {"detail": "Deleted successfully"}
 
 @app.post("/piano", response_model=ResourceResponse)
-def save_piano_sequence(req: MusicSequenceSchema, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
+def save_piano_sequence(req: MusicSequenceSchema, user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
+    # Same deactivate-then-upsert as save_gesture, keyed by (user_id, title)
+    table = models.MusicSequence
     if req.is_active:
-        db.query(models.MusicSequence).filter(models.MusicSequence.user_id == user.id).update({"is_active": False})
-    
-    existing = db.query(models.MusicSequence).filter(models.MusicSequence.user_id == user.id, models.MusicSequence.title == req.title).first()
-
-    if existing:
-        existing.sequence_data = req.sequence_data
-        existing.is_active = req.is_active
-        db.commit()
-        db.refresh(existing)
-        s = existing
-    else:
-        s = models.MusicSequence(
-            user_id=user.id,
-            title=req.title,
-            sequence_data=req.sequence_data,
-            is_active=req.is_active
+        db.execute(
+            update(table)
+            .where(table.user_id == user.id, table.is_active == True, table.title != req.title)
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
         )
-        db.add(s)
-        db.commit()
-        db.refresh(s)
+    stmt = pg_insert(table).values(
+        user_id=user.id,
+        title=req.title,
+        sequence_data=req.sequence_data,
+        is_active=req.is_active,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.user_id, table.title],
+        set_={"sequence_data": stmt.excluded.sequence_data, "is_active": stmt.excluded.is_active},
+    ).returning(table.id, table.title, table.sequence_data, table.is_active, table.is_public, table.created_at)
+    s = db.execute(stmt).one()
+    db.commit()
+    if s.is_public:
+        invalidate_config_caches()
 
     return ResourceResponse(
         id=s.id,
@@ -659,7 +921,7 @@ def save_piano_sequence(req: MusicSequenceSchema, user: models.User = Depends(re
         data=s.sequence_data,
         is_active=s.is_active,
         is_public=s.is_public,
-        created_at=s.created_at.isoformat(),
+        created_at=s.created_at,
         author=user.username
     )
 
@@ -675,98 +937,131 @@ class TrainingSessionSchema(BaseModel):
 class TrainingSessionResponse(BaseModel):
     id: int
     class_names: list
-    created_at: str
+    created_at: datetime
 
 @app.post("/training-sessions", response_model=TrainingSessionResponse)
-def save_training_session(req: TrainingSessionSchema, user: models.User = Depends(require_user), db: Session = Depends(get_db)):
-    session = models.TrainingSession(
-        user_id=user.id,
-        class_names=req.class_names,
-        samples=req.samples
-    )
-    db.add(session)
+def save_training_session(req: TrainingSessionSchema, user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
+    # One INSERT ... RETURNING instead of add/commit/refresh; the samples are
+    # never read back, and the reply is serialized by orjson without a model
+    table = models.TrainingSession
+    row = db.execute(
+        insert(table)
+        .values(user_id=user.id, class_names=req.class_names, samples=req.samples)
+        .returning(table.id, table.class_names, table.created_at)
+    ).one()
     db.commit()
-    db.refresh(session)
-    
-    return TrainingSessionResponse(
-        id=session.id,
-        class_names=session.class_names,
-        created_at=session.created_at.isoformat()
-    )
+
+    return ORJSONResponse(content=dict(row._mapping))
 
 @app.get("/training-sessions", response_model=List[TrainingSessionResponse])
-def get_training_sessions(user: models.User = Depends(require_user), db: Session = Depends(get_db)):
-    results = (
-        db.query(models.TrainingSession)
-        .filter(models.TrainingSession.user_id == user.id)
-        .order_by(models.TrainingSession.created_at.desc())
+def get_training_sessions(user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
+    # Only the listed columns: samples can be large and are never returned here
+    table = models.TrainingSession
+    results = db.execute(
+        select(table.id, table.class_names, table.created_at)
+        .where(table.user_id == user.id)
+        .order_by(table.created_at.desc())
         .limit(10)
-        .all()
-    )
-    return [
-        TrainingSessionResponse(
-            id=s.id,
-            class_names=s.class_names,
-            created_at=s.created_at.isoformat()
-        )
-        for s in results
-    ]
+    ).all()
+    return ORJSONResponse([dict(s._mapping) for s in results])
 @app.get("/gestures/community", response_model=List[ResourceResponse])
 def list_community_gestures(
-    search: Optional[str] = Query(None),
+    search: Optional[str] = Query(None, max_length=100),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
 ):
-    query = (
-        db.query(models.GestureMapping)
-        .join(models.User)
-        .filter(models.GestureMapping.is_public == True)
-    )
-    if search:
-        query = query.filter(models.GestureMapping.name.ilike(f"%{search}%"))
-
-    results = query.order_by(models.GestureMapping.created_at.desc()).offset(offset).limit(limit).all()
-
-    return [
-        ResourceResponse(
-            id=g.id,
-            name_or_title=g.name,
-            data=g.mapping_data,
-            is_active=False, # Shared ones aren't active for viewer
-            created_at=g.created_at.isoformat(),
-            author=g.user.username
+    cache_key = (search, limit, cursor or offset)
+    with _response_cache_lock:
+        cached = _community_gestures_cache.get(cache_key)
+    if cached is None:
+        query = (
+            db.query(models.GestureMapping)
+            .join(models.User)
+            .options(contains_eager(models.GestureMapping.user))
+            .filter(models.GestureMapping.is_public == True)
         )
-        for g in results
-    ]
+        if search:
+            query = query.filter(models.GestureMapping.name.ilike(contains_pattern(search), escape="\\"))
+
+        # Keyset pagination, as in /models/community
+        query = query.order_by(models.GestureMapping.created_at.desc(), models.GestureMapping.id.desc())
+        if cursor:
+            query = query.filter(tuple_(models.GestureMapping.created_at, models.GestureMapping.id) < decode_cursor(cursor))
+        else:
+            query = query.offset(offset)
+        results = query.limit(limit).all()
+
+        items = [
+            {
+                "id": g.id,
+                "name_or_title": g.name,
+                "data": g.mapping_data,
+                "is_active": False,  # Shared ones aren't active for viewer
+                "is_public": True,
+                "created_at": g.created_at,
+                "author": g.user.username,
+            }
+            for g in results
+        ]
+        next_cursor = encode_cursor(results[-1].created_at, results[-1].id) if len(results) == limit else None
+        cached = (orjson.dumps(items), next_cursor)
+        with _response_cache_lock:
+            _community_gestures_cache[cache_key] = cached
+
+    body, next_cursor = cached
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 
 @app.get("/piano/community", response_model=List[ResourceResponse])
 def list_community_piano(
-    search: Optional[str] = Query(None),
+    search: Optional[str] = Query(None, max_length=100),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
 ):
-    query = (
-        db.query(models.MusicSequence)
-        .join(models.User)
-        .filter(models.MusicSequence.is_public == True)
-    )
-    if search:
-        query = query.filter(models.MusicSequence.title.ilike(f"%{search}%"))
-
-    results = query.order_by(models.MusicSequence.created_at.desc()).offset(offset).limit(limit).all()
-
-    return [
-        ResourceResponse(
-            id=s.id,
-            name_or_title=s.title,
-            data=s.sequence_data,
-            is_active=False,
-            is_public=True,
-            created_at=s.created_at.isoformat(),
-            author=s.user.username
+    cache_key = (search, limit, cursor or offset)
+    with _response_cache_lock:
+        cached = _community_piano_cache.get(cache_key)
+    if cached is None:
+        query = (
+            db.query(models.MusicSequence)
+            .join(models.User)
+            .options(contains_eager(models.MusicSequence.user))
+            .filter(models.MusicSequence.is_public == True)
         )
-        for s in results
-    ]
+        if search:
+            query = query.filter(models.MusicSequence.title.ilike(contains_pattern(search), escape="\\"))
+
+        # Keyset pagination, as in /models/community
+        query = query.order_by(models.MusicSequence.created_at.desc(), models.MusicSequence.id.desc())
+        if cursor:
+            query = query.filter(tuple_(models.MusicSequence.created_at, models.MusicSequence.id) < decode_cursor(cursor))
+        else:
+            query = query.offset(offset)
+        results = query.limit(limit).all()
+
+        items = [
+            {
+                "id": s.id,
+                "name_or_title": s.title,
+                "data": s.sequence_data,
+                "is_active": False,
+                "is_public": True,
+                "created_at": s.created_at,
+                "author": s.user.username,
+            }
+            for s in results
+        ]
+        next_cursor = encode_cursor(results[-1].created_at, results[-1].id) if len(results) == limit else None
+        cached = (orjson.dumps(items), next_cursor)
+        with _response_cache_lock:
+            _community_piano_cache[cache_key] = cached
+
+    body, next_cursor = cached
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
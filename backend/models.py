@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, JSON, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, JSON, Boolean, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -46,6 +46,13 @@ class GestureMapping(Base):
 
     user = relationship("User", back_populates="motor_configs")
 
+    __table_args__ = (
+        # POST /gestures upserts on (user_id, name)
+        Index("uq_motor_configs_user_name", user_id, name, unique=True),
+        # /gestures/community: WHERE is_public ORDER BY created_at DESC, id DESC
+        Index("ix_motor_configs_public_created_id", created_at.desc(), id.desc(), postgresql_where=is_public),
+    )
+
 
 class MusicSequence(Base):
     __tablename__ = "piano_sequences"
@@ -60,6 +67,13 @@ class MusicSequence(Base):
 
     user = relationship("User", back_populates="piano_sequences")
 
+    __table_args__ = (
+        # POST /piano upserts on (user_id, title)
+        Index("uq_piano_sequences_user_title", user_id, title, unique=True),
+        # /piano/community: WHERE is_public ORDER BY created_at DESC, id DESC
+        Index("ix_piano_sequences_public_created_id", created_at.desc(), id.desc(), postgresql_where=is_public),
+    )
+
 
 class HighScore(Base):
     __tablename__ = "high_scores"
@@ -94,13 +108,24 @@ class SavedModel(Base):
     name = Column(String, index=True)
     description = Column(String, nullable=True)
     class_names = Column(JSON)             # ["thumbs_up", "peace"]
-    model_data = Column(JSON)              # topology + weights (base64 encoded)
+    model_data = Column(JSON)              # topology + weightSpecs (legacy rows also hold base64 weightData)
+    weight_data = Column(LargeBinary, nullable=True)  # raw TF.js weightData bytes
     dataset = Column(JSON, nullable=True)  # { features: [...], labels: [...] } for retraining
     is_public = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=True)  # bumped by every save
 
     user = relationship("User", back_populates="saved_models")
 
+    __table_args__ = (
+        # /models/community: WHERE is_public ORDER BY created_at DESC, id DESC (keyset pages)
+        Index("ix_saved_models_public_created_id", created_at.desc(), id.desc(), postgresql_where=is_public),
+        # /models/my: WHERE user_id = ? ORDER BY created_at DESC
+        Index("ix_saved_models_user_created", user_id, created_at.desc()),
+        # POST /models/save upserts on (user_id, name)
+        Index("uq_saved_models_user_name", user_id, name, unique=True),
+    )
+
 
 class TrainingSession(Base):
     __tablename__ = "training_sessions"
@@ -113,14 +138,7 @@ class TrainingSession(Base):
 
     user = relationship("User", back_populates="training_sessions")
 
-
-class PasswordResetToken(Base):
-    __tablename__ = "password_reset_tokens"
-
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    token = Column(String, unique=True, index=True)
-    expires_at = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow)
-
-    user = relationship("User")
+    __table_args__ = (
+        # GET /training-sessions: WHERE user_id = ? ORDER BY created_at DESC LIMIT 10
+        Index("ix_training_sessions_user_created", user_id, created_at.desc()),
+    )